@@ -11,6 +11,10 @@
 import sys
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
+from itertools import izip
+from multiprocessing.dummy import Pool
 
 MIRROR_URL_DIR="https://z.cash/depends-sources/"
 DEPENDS_SOURCES_DIR=os.path.realpath(os.path.join(
@@ -18,26 +22,74 @@ DEPENDS_SOURCES_DIR=os.path.realpath(os.path.join(
     "..", "..", "depends", "sources"
 ))
 
+# Number of HEAD requests in flight at once. The checks are independent, so
+# running them concurrently bounds the total time by the slowest requests
+# rather than the sum of all of them.
+MAX_CONCURRENT_CHECKS=16
+
+# All requests go to the same host, so share one session whose connection
+# pool is large enough for every worker to keep its connection alive instead
+# of paying for a new TCP and TLS handshake per file. Transient errors from
+# the mirror are retried with exponential backoff rather than failing the
+# whole check.
+session = requests.Session()
+adapter = HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=MAX_CONCURRENT_CHECKS,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+    ),
+)
+session.mount("https://", adapter)
+session.mount("http://", adapter)
+
+# The Content-Length of the response is compared against the local file
+# size, so ask for the file as stored rather than a compressed encoding.
+session.headers.update({
+    "Accept": "*/*",
+    "Accept-Encoding": "identity",
+})
+
+# (connect, read) timeouts, so that an unresponsive mirror fails quickly
+# instead of hanging the check.
+REQUEST_TIMEOUT=(5, 15)
+
 def get_depends_sources_list():
     return filter(
 	lambda f: os.path.isfile(os.path.join(DEPENDS_SOURCES_DIR, f)),
 	os.listdir(DEPENDS_SOURCES_DIR)
     )
 
-for filename in get_depends_sources_list():
-    resp = requests.head(MIRROR_URL_DIR + filename)
-
-    print "Checking [" + filename + "] ..."
+def check_mirror(filename):
+    # Returns None if the mirror has the file, or an error message otherwise.
+    try:
+	resp = session.head(MIRROR_URL_DIR + filename, timeout=REQUEST_TIMEOUT)
+    except requests.exceptions.RequestException as e:
+	return "Could not check %s on server: %s" % (filename, e)
 
     if resp.status_code != 200:
-	print "FAIL. File not found on server: " + filename
-	sys.exit(1)
+	return "File not found on server: " + filename
 
     expected_size = os.path.getsize(os.path.join(DEPENDS_SOURCES_DIR, filename))
     server_size = int(resp.headers['Content-Length'])
     if expected_size != server_size:
-	print "FAIL. On the server, %s is %d bytes, but locally it is %d bytes." % (filename, server_size, expected_size)
+	return "On the server, %s is %d bytes, but locally it is %d bytes." % (filename, server_size, expected_size)
+
+    return None
+
+filenames = get_depends_sources_list()
+pool = Pool(MAX_CONCURRENT_CHECKS)
+
+# imap() yields results in submission order, so the output (and the first
+# failure reported) is the same as checking the files one at a time.
+for filename, error in izip(filenames, pool.imap(check_mirror, filenames)):
+    print "Checking [" + filename + "] ..."
+
+    if error is not None:
+	print "FAIL. " + error
 	sys.exit(1)
 
 print "PASS."
-sys.exit(0)
\ No newline at end of file
+sys.exit(0)